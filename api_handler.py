@@ -1,85 +1,175 @@
+import re
 import requests
+from requests.adapters import HTTPAdapter
 import json
+from rapidfuzz import process, fuzz
+from rapidfuzz.distance import OSA
 from langchain.prompts import PromptTemplate
+from api_metadata import API_METADATA_TEXT
+
+# Base URL of the financial API
+API_BASE_URL = "https://api.example.com"
+
+# Shared HTTP session so outbound calls reuse pooled keep-alive connections
+_SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=10, pool_maxsize=50, max_retries=3)
+_SESSION.mount("https://", _adapter)
+_SESSION.mount("http://", _adapter)
+
+# Canonical API names for the company names and tickers we recognise in user queries
+_ALIAS = {
+    "apple": "Apple Inc.",
+    "aapl": "Apple Inc.",
+    "microsoft": "Microsoft Corp",
+    "msft": "Microsoft Corp",
+    "google": "Alphabet Inc.",
+    "alphabet": "Alphabet Inc.",
+    "googl": "Alphabet Inc.",
+    "amazon": "Amazon.com Inc.",
+    "amzn": "Amazon.com Inc.",
+    "tesla": "Tesla Inc.",
+    "tsla": "Tesla Inc.",
+}
+
+# Ticker aliases are codes, so they only ever match exactly (never as a plural or a fuzzy match)
+_TICKERS = frozenset({"aapl", "msft", "googl", "amzn", "tsla"})
+
+_TOKEN_RE = re.compile(r"[a-z]+")
+
+def _lookup_company_name(text: str):
+    """Return the canonical name of the first word in text that is a known alias (or its plural), or None"""
+    for token in _TOKEN_RE.findall(text.lower()):
+        # Accept the alias itself or a trailing "s" ("apples"; "tesla's" tokenizes to "tesla"),
+        # not longer words that merely start with it ("alphabetical", "amazonian", "aaplx")
+        canonical = _ALIAS.get(token) or (
+            _ALIAS.get(token[:-1]) if token.endswith("s") and token[:-1] not in _TICKERS else None
+        )
+        if canonical:
+            return canonical
+    return None
+
+# Fuzzy matching settings for misspelled names (e.g. "microsft", "appl", "googel"); the cutoff is high enough
+# that ordinary words such as "apply" or "maple" are not taken for company names
+_FUZZY_CUTOFF = 85
+_FUZZY_MIN_LENGTH = 4
+
+# Aliases grouped by first letter: a misspelling is only matched against aliases with the same initial
+_CHOICES_BY_INITIAL = {}
+for _alias in _ALIAS:
+    if _alias not in _TICKERS:
+        _CHOICES_BY_INITIAL.setdefault(_alias[0], []).append(_alias)
+
+def _is_transposition(token: str, alias: str) -> bool:
+    """Whether token is alias with one pair of adjacent letters swapped (e.g. "googel", "micorsoft")"""
+    # Same length, one OSA edit and the same letters can only be an adjacent swap, never a substitution
+    return len(token) == len(alias) and OSA.distance(token, alias) == 1 and sorted(token) == sorted(alias)
+
+def _fuzzy_company_name(text: str):
+    """Return the canonical name of the closest alias to any word in text, or None"""
+    for token in _TOKEN_RE.findall(text.lower()):
+        if len(token) < _FUZZY_MIN_LENGTH:
+            continue
+        choices = _CHOICES_BY_INITIAL.get(token[0])
+        if not choices:
+            continue
+        # As in the exact lookup, a longer word that merely starts with an alias ("alphabetic", "applet",
+        # "teslar") is not a misspelling of it
+        if any(token.startswith(alias) for alias in choices):
+            continue
+        # Nor is a word more than one letter longer or shorter than the alias ("analphabet")
+        choices = [alias for alias in choices if abs(len(token) - len(alias)) <= 1]
+        match = process.extractOne(token, choices, scorer=fuzz.ratio, score_cutoff=_FUZZY_CUTOFF)
+        if match:
+            return _ALIAS[match[0]]
+        # fuzz.ratio scores a swap of adjacent letters as two edits, which the cutoff rejects for short names
+        for alias in choices:
+            if _is_transposition(token, alias):
+                return _ALIAS[alias]
+    return None
+
+def _find_company_name(text: str):
+    """Return the canonical name of the company mentioned in text, or None"""
+    # Look up each word of the cleaned input
+    canonical = _lookup_company_name(text)
+    if canonical:
+        return canonical
+    
+    # Fall back to fuzzy matching for misspellings
+    return _fuzzy_company_name(text)
 
 def normalize_company_name(company_name: str) -> str:
     """Normalize company name to match API format."""
-    company_mapping = {
-        "apple": "Apple Inc.",
-        "microsoft": "Microsoft Corp",
-        # Add more mappings as needed
-    }
-    
-    # Clean and normalize the input
-    cleaned_name = company_name.lower().strip()
-    
-    # Check for exact matches in mapping
-    for key, value in company_mapping.items():
-        if key in cleaned_name:
-            return value
-            
-    # If no match found, try to append Inc./Corp
-    if "microsoft" in cleaned_name or "msft" in cleaned_name:
-        return "Microsoft Corp"
-    if "apple" in cleaned_name:
-        return "Apple Inc."
-        
-    # If still no match, return original (will likely result in 404)
-    return company_name
+    # If no match, return original (will likely result in 404)
+    return _find_company_name(company_name) or company_name
 
 def extract_company_name(user_query: str) -> str:
     """Extract company name from user query."""
     # This is a simplified version - in a real app, you'd use NLP
-    common_companies = ["apple", "microsoft", "google", "amazon", "tesla"]
-    
-    for company in common_companies:
-        if company.lower() in user_query.lower():
-            return normalize_company_name(company)
-    
-    return "NONE"  # Indicates no specific company found
+    return _find_company_name(user_query) or "NONE"  # "NONE" indicates no specific company found
+
+def _mock_company_data(company_name):
+    """Mock detailed financial data for a single company"""
+    return {
+        "company_name": company_name,
+        "financial_metrics": {
+            "revenue": "$365.8B",
+            "profit_margin": "25.9%",
+            "operating_expenses": "$87.5B",
+            "cash_flow": "$111.4B"
+        },
+        "stock_data": {
+            "current_price": "$182.63",
+            "market_cap": "$2.87T",
+            "pe_ratio": "30.42",
+            "dividend_yield": "0.5%"
+        },
+        "historical_performance": {
+            "revenue_growth": "7.8%",
+            "profit_growth": "5.2%",
+            "previous_year_revenue": "$338.5B",
+            "previous_year_profit": "$94.7B"
+        },
+        "last_updated": "2023-06-15T14:30:00Z"
+    }
 
-def call_financial_api(company_name=None):
-    """Call the financial API to get data."""
+def call_financial_api(company_name=None, company_names=None):
+    """Call the financial API to get data; several company_names are fetched in one batch request."""
     # In a real app, this would make an actual API call
     # For this example, we'll simulate the API response
     
+    if company_names and len(company_names) > 1:
+        # Simulate one batch call for several companies
+        try:
+            # In a real app, this would be:
+            # response = _SESSION.post(f"{API_BASE_URL}/batch", json={"pipeline": [
+            #     {"method": "GET", "path": f"/financial-data/{name}"} for name in company_names
+            # ]}, timeout=5)
+            # responses = response.json()["responses"]  # One item per pipeline request, in order
+            # return {name: item["body"] for name, item in zip(company_names, responses, strict=True)}
+            
+            # For this example, return mock data
+            return {name: _mock_company_data(name) for name in company_names}
+        except Exception as e:
+            return f"Error fetching financial data: {str(e)}"
+    elif company_names:
+        company_name = company_names[0]
+    
     if company_name and company_name != "NONE":
         # Simulate API call for specific company
         try:
             # In a real app, this would be:
-            # response = requests.get(f"https://api.example.com/financial-data/{company_name}")
+            # response = _SESSION.get(f"{API_BASE_URL}/financial-data/{company_name}", timeout=5)
             # return response.json()
             
             # For this example, return mock data
-            return {
-                "company_name": company_name,
-                "financial_metrics": {
-                    "revenue": "$365.8B",
-                    "profit_margin": "25.9%",
-                    "operating_expenses": "$87.5B",
-                    "cash_flow": "$111.4B"
-                },
-                "stock_data": {
-                    "current_price": "$182.63",
-                    "market_cap": "$2.87T",
-                    "pe_ratio": "30.42",
-                    "dividend_yield": "0.5%"
-                },
-                "historical_performance": {
-                    "revenue_growth": "7.8%",
-                    "profit_growth": "5.2%",
-                    "previous_year_revenue": "$338.5B",
-                    "previous_year_profit": "$94.7B"
-                },
-                "last_updated": "2023-06-15T14:30:00Z"
-            }
+            return _mock_company_data(company_name)
         except Exception as e:
             return f"Error fetching data for {company_name}: {str(e)}"
     else:
         # Simulate API call for all companies
         try:
             # In a real app, this would be:
-            # response = requests.get("https://api.example.com/financial-data")
+            # response = _SESSION.get(f"{API_BASE_URL}/financial-data", timeout=5)
             # return response.json()
             
             # For this example, return mock data for multiple companies
@@ -103,40 +193,66 @@ def call_financial_api(company_name=None):
         except Exception as e:
             return f"Error fetching financial data: {str(e)}"
 
+def close_session():
+    """Close the shared HTTP session and its pooled connections"""
+    _SESSION.close()
+
+# Display labels for the metric keys returned by the API
+_LABELS = {
+    "revenue": "Revenue",
+    "profit_margin": "Profit Margin",
+    "operating_expenses": "Operating Expenses",
+    "cash_flow": "Cash Flow",
+    "current_price": "Current Price",
+    "market_cap": "Market Cap",
+    "pe_ratio": "Pe Ratio",
+    "dividend_yield": "Dividend Yield",
+    "revenue_growth": "Revenue Growth",
+    "profit_growth": "Profit Growth",
+    "previous_year_revenue": "Previous Year Revenue",
+    "previous_year_profit": "Previous Year Profit",
+}
+
+def _metric_lines(metrics):
+    """Yield one bullet line per metric"""
+    for key, value in metrics.items():
+        # Derive a label for keys not in the table
+        label = _LABELS.get(key) or key.replace('_', ' ').title()
+        yield f"  • {label}: {value}\n"
+
 def format_api_response(api_data, user_query):
     """Format API response based on user query."""
+    # For a batch result keyed by company
+    if isinstance(api_data, dict) and "company_name" not in api_data:
+        return "\n\n".join(format_api_response(data, user_query) for data in api_data.values())
+    
     # For a single company
     if isinstance(api_data, dict):
-        company = api_data["company_name"]
-        output = f"Financial Data for {company}:\n\n"
+        parts = [f"Financial Data for {api_data['company_name']}:\n\n"]
         
         # Add financial metrics
-        output += "Financial Metrics:\n"
-        for key, value in api_data["financial_metrics"].items():
-            output += f"  • {key.replace('_', ' ').title()}: {value}\n"
+        parts.append("Financial Metrics:\n")
+        parts.extend(_metric_lines(api_data["financial_metrics"]))
         
         # Add stock data
-        output += "\nStock Data:\n"
-        for key, value in api_data["stock_data"].items():
-            output += f"  • {key.replace('_', ' ').title()}: {value}\n"
+        parts.append("\nStock Data:\n")
+        parts.extend(_metric_lines(api_data["stock_data"]))
         
         # Add historical performance
-        output += "\nHistorical Performance:\n"
-        for key, value in api_data["historical_performance"].items():
-            output += f"  • {key.replace('_', ' ').title()}: {value}\n"
+        parts.append("\nHistorical Performance:\n")
+        parts.extend(_metric_lines(api_data["historical_performance"]))
         
-        output += f"\nLast Updated: {api_data['last_updated']}"
-        return output
+        parts.append(f"\nLast Updated: {api_data['last_updated']}")
+        return "".join(parts)
     
     # For multiple companies
     elif isinstance(api_data, list):
-        output = "Financial Data Summary:\n\n"
+        parts = ["Financial Data Summary:\n\n"]
         for company in api_data:
-            output += f"{company['company_name']}:\n"
-            for key, value in company["financial_metrics"].items():
-                output += f"  • {key.replace('_', ' ').title()}: {value}\n"
-            output += "\n"
-        return output
+            parts.append(f"{company['company_name']}:\n")
+            parts.extend(_metric_lines(company["financial_metrics"]))
+            parts.append("\n")
+        return "".join(parts)
     
     # For error messages
     else:
@@ -162,17 +278,9 @@ def handle_api_query(llm, user_query):
         print("-" * 50)
         print(formatted_response)
 
-def load_api_metadata(filename: str = "api_metadata.txt") -> str:
-    """Load the API metadata from file"""
-    try:
-        with open(filename, 'r') as f:
-            return f.read()
-    except FileNotFoundError:
-        print("⚠️ API metadata file not found, generating new one...")
-        from api_metadata import generate_api_metadata
-        filename = generate_api_metadata()
-        with open(filename, 'r') as f:
-            return f.read()
+def load_api_metadata() -> str:
+    """Load the API metadata (built into api_metadata, no file I/O)"""
+    return API_METADATA_TEXT
 
 def get_api_info():
     """Get the API information"""
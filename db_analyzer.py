@@ -1,22 +1,34 @@
+import io
+import os
 import sqlite3
 import json
+from functools import lru_cache
 from typing import Dict, List, Any
 
+# Column constraint annotations keyed by (primary_key, nullable)
+_CONSTRAINT_SUFFIXES = {
+    (True, False): " (PRIMARY KEY, NOT NULL)",
+    (True, True): " (PRIMARY KEY)",
+    (False, False): " (NOT NULL)",
+    (False, True): "",
+}
+
 class DatabaseAnalyzer:
     def __init__(self, db_path: str = "ecommerce.db"):
         self.db_path = db_path
         self.conn = sqlite3.connect(db_path)
         self.cursor = self.conn.cursor()
+        self.refresh()
 
-    def get_table_info(self) -> Dict[str, List[Dict[str, Any]]]:
-        """Get detailed information about all tables in the database"""
-        # Get list of all tables
-        self.cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-        tables = self.cursor.fetchall()
+    def refresh(self):
+        """Introspect every table once and cache schema and statistics"""
+        # Get list of all tables, skipping SQLite's internal ones (e.g. sqlite_stat1 from ANALYZE)
+        self.cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite\\_%' ESCAPE '\\';")
+        self._tables = [table[0] for table in self.cursor.fetchall()]
         
-        table_info = {}
-        for table in tables:
-            table_name = table[0]
+        self._info = {}
+        self._stats = {}
+        for table_name in self._tables:
             # Get column info for each table
             self.cursor.execute(f"PRAGMA table_info({table_name});")
             columns = self.cursor.fetchall()
@@ -25,8 +37,16 @@ class DatabaseAnalyzer:
             self.cursor.execute(f"PRAGMA foreign_key_list({table_name});")
             foreign_keys = self.cursor.fetchall()
             
+            # Get row count
+            self.cursor.execute(f"SELECT COUNT(*) FROM {table_name};")
+            row_count = self.cursor.fetchone()[0]
+            
+            # Get sample values for each column
+            self.cursor.execute(f"SELECT * FROM {table_name} LIMIT 5;")
+            sample_data = self.cursor.fetchall()
+            
             # Store column details
-            table_info[table_name] = {
+            self._info[table_name] = {
                 "columns": [
                     {
                         "name": col[1],
@@ -43,85 +63,63 @@ class DatabaseAnalyzer:
                     } for fk in foreign_keys
                 ]
             }
-        
-        return table_info
-
-    def get_table_statistics(self) -> Dict[str, Dict[str, Any]]:
-        """Get statistics about each table"""
-        stats = {}
-        for table_name in self.get_tables():
-            # Get row count
-            self.cursor.execute(f"SELECT COUNT(*) FROM {table_name};")
-            row_count = self.cursor.fetchone()[0]
-            
-            # Get sample values for each column
-            self.cursor.execute(f"SELECT * FROM {table_name} LIMIT 5;")
-            sample_data = self.cursor.fetchall()
-            
-            # Get column names
-            self.cursor.execute(f"PRAGMA table_info({table_name});")
-            columns = [col[1] for col in self.cursor.fetchall()]
             
-            stats[table_name] = {
+            self._stats[table_name] = {
                 "row_count": row_count,
                 "sample_values": {
-                    col: [row[idx] for row in sample_data] 
+                    col[1]: [row[idx] for row in sample_data] 
                     for idx, col in enumerate(columns)
                 } if sample_data else {}
             }
-        
-        return stats
+
+    def get_table_info(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Get detailed information about all tables in the database"""
+        return self._info
+
+    def get_table_statistics(self) -> Dict[str, Dict[str, Any]]:
+        """Get statistics about each table"""
+        return self._stats
 
     def get_tables(self) -> List[str]:
         """Get list of all tables"""
-        self.cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-        return [table[0] for table in self.cursor.fetchall()]
+        return self._tables
 
     def generate_llm_metadata(self) -> str:
         """Generate formatted metadata string for LLM"""
         table_info = self.get_table_info()
         table_stats = self.get_table_statistics()
         
-        metadata = ["Database Schema and Statistics:", ""]
+        buf = io.StringIO()
+        buf.write("Database Schema and Statistics:\n\n")
         
         # Add relationships overview
-        metadata.append("Table Relationships:")
+        buf.write("Table Relationships:\n")
         for table_name, info in table_info.items():
-            if info["foreign_keys"]:
-                for fk in info["foreign_keys"]:
-                    metadata.append(f"- {table_name}.{fk['from']} -> {fk['to_table']}.{fk['to_column']}")
-        metadata.append("")
+            for fk in info["foreign_keys"]:
+                buf.write(f"- {table_name}.{fk['from']} -> {fk['to_table']}.{fk['to_column']}\n")
         
         # Add detailed table information
-        for table_name in self.get_tables():
+        for table_name in self._tables:
             info = table_info[table_name]
             stats = table_stats[table_name]
             
-            metadata.append(f"Table: {table_name}")
-            metadata.append(f"Total Records: {stats['row_count']}")
-            metadata.append("Columns:")
+            buf.write(f"\nTable: {table_name}\n")
+            buf.write(f"Total Records: {stats['row_count']}\n")
+            buf.write("Columns:\n")
             
             for col in info["columns"]:
-                constraints = []
-                if col["primary_key"]:
-                    constraints.append("PRIMARY KEY")
-                if not col["nullable"]:
-                    constraints.append("NOT NULL")
-                
-                constraint_str = f" ({', '.join(constraints)})" if constraints else ""
-                metadata.append(f"- {col['name']} ({col['type']}){constraint_str}")
+                constraint_str = _CONSTRAINT_SUFFIXES[col["primary_key"], col["nullable"]]
+                buf.write(f"- {col['name']} ({col['type']}){constraint_str}\n")
             
             # Add sample values if available
             if stats["sample_values"]:
-                metadata.append("Sample Values:")
+                buf.write("Sample Values:\n")
                 for col, values in stats["sample_values"].items():
                     unique_values = list(set(str(v) for v in values if v is not None))[:3]
                     if unique_values:
-                        metadata.append(f"- {col}: {', '.join(unique_values)}")
-            
-            metadata.append("")
+                        buf.write(f"- {col}: {', '.join(unique_values)}\n")
         
-        return "\n".join(metadata)
+        return buf.getvalue()
 
     def save_metadata_to_file(self, filename: str = "db_metadata.txt"):
         """Save the metadata to a file"""
@@ -133,8 +131,24 @@ class DatabaseAnalyzer:
         """Close the database connection"""
         self.conn.close()
 
+def _file_signature(path: str):
+    """(mtime_ns, size) of a file, or None if it does not exist"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
 def get_db_metadata(db_path: str = "ecommerce.db") -> str:
     """Convenience function to get database metadata"""
+    # Key the cache on the database file and its WAL file: in WAL mode commits land in the -wal file
+    # and only reach the main file at a checkpoint
+    db_version = (_file_signature(db_path), _file_signature(db_path + "-wal"))
+    return _cached_db_metadata(db_path, db_version)
+
+@lru_cache(maxsize=4)
+def _cached_db_metadata(db_path: str, db_version) -> str:
+    """Generate database metadata once per (db_path, file signatures) pair"""
     analyzer = DatabaseAnalyzer(db_path)
     metadata = analyzer.generate_llm_metadata()
     analyzer.close()
@@ -163,22 +177,23 @@ Example Queries:
    - "Show distribution of order amounts"
 
 3. Data Relationships:
-   - Products belong to Categories
-   - Orders contain multiple Order Items
-   - Customers can have multiple Addresses
-   - Each Order Item references a Product
+   - Each purchase references a product (purchases.product_sku -> products.sku)
+   - Each purchase belongs to a basket (purchases.basket_id -> baskets.basket_id)
+   - Basket status and client details (name, country) live in baskets; join on basket_id
 
 SQL Date Functions:
+- Dates (purchases.purchase_date, products.release_date, baskets.creation_date) are stored as 'YYYY-MM-DD' text
+- purchases.purchase_date is indexed
 - Use strftime('%Y-%m-%d', date_column) for full date
 - Use strftime('%m', date_column) for month
 - Use strftime('%Y', date_column) for year
-- Example: strftime('%Y-%m', order_date) = '2024-01' for January 2024
+- Example: strftime('%Y-%m', purchase_date) = '2024-01' for January 2024
 
 Common Aggregations:
 - COUNT(*) for counting records
 - SUM(quantity * price) for total sales
 - AVG(price) for average prices
-- GROUP BY category_id, strftime('%Y-%m', order_date) for monthly category reports
+- GROUP BY product_category, strftime('%Y-%m', purchase_date) for monthly category reports
 """
     
     # Get database metadata
@@ -1,15 +1,112 @@
 import sqlite3
-import os
 import random
 from datetime import datetime, timedelta
+import numpy as np
 from faker import Faker
-import uuid
-import json
+from collections import Counter
+import orjson
 import string
+from db_analyzer import save_llm_prompt_data
 
 # Database file path
 DB_FILE = "ecommerce.db"
 
+# Version of the schema built by create_tables, stored in PRAGMA user_version; bump it when the schema changes
+SCHEMA_VERSION = 1
+
+# Seed for reproducible sample data
+SEED = 42
+
+# Shared generators: Faker is expensive to construct, so build it once per process
+_FAKER = Faker()
+_RNG = np.random.default_rng(SEED)
+
+def seed_generators(seed=SEED):
+    """Reset Faker, `random` and the NumPy generator so a seeding run is reproducible"""
+    global _RNG
+    Faker.seed(seed)
+    random.seed(seed)
+    _RNG = np.random.default_rng(seed)
+
+# Value pools for generated products
+CATEGORIES = ['Laptops', 'Desktop PCs', 'Monitors', 'Keyboards', 'Mice',
+              'Headphones', 'Speakers', 'Webcams', 'Printers', 'Storage']
+BRANDS = ['Dell', 'HP', 'Lenovo', 'Apple', 'ASUS', 'Acer', 'LG', 'Samsung', 'BenQ', 'Logitech',
+          'Razer', 'Corsair', 'HyperX', 'SteelSeries', 'Sony', 'Bose', 'Sennheiser', 'JBL', 'Sonos',
+          'Harman Kardon']
+PRODUCT_STATUSES = ['in_stock', 'low_stock', 'out_of_stock', 'discontinued']
+BASKET_STATUSES = ['completed', 'pending', 'cancelled', 'refunded']
+
+# Sizes of the pre-generated Faker value pools (tunable: larger pools give more variety)
+CLIENT_POOL_SIZE = 300
+COLOR_POOL_SIZE = 150
+DESCRIPTION_POOL_SIZE = 100
+
+# Value pools for category-specific specifications
+SCREEN_SIZES = (13, 14, 15, 16, 17)
+RAM_SIZES = (8, 16, 32, 64)
+STORAGE_SIZES = (256, 512, 1024, 2048)
+RESOLUTIONS = ('1920x1080', '2560x1440', '3840x2160')
+REFRESH_RATES = (60, 75, 144, 165, 240)
+PANEL_TYPES = ('IPS', 'VA', 'TN', 'OLED')
+
+def build_laptop_specs(specs):
+    """Add laptop-specific specifications to `specs`"""
+    specs["screen_size"] = f"{random.choice(SCREEN_SIZES)} inch"
+    specs["processor"] = f"Intel Core i{random.randint(3, 9)} Gen {random.randint(10, 13)}"
+    specs["ram"] = f"{random.choice(RAM_SIZES)}GB"
+    specs["storage"] = f"{random.choice(STORAGE_SIZES)}GB SSD"
+    return specs
+
+def build_monitor_specs(specs):
+    """Add monitor-specific specifications to `specs`"""
+    specs["resolution"] = random.choice(RESOLUTIONS)
+    specs["refresh_rate"] = f"{random.choice(REFRESH_RATES)}Hz"
+    specs["panel_type"] = random.choice(PANEL_TYPES)
+    return specs
+
+def build_default_specs(specs):
+    """Categories without extra specifications keep the common ones"""
+    return specs
+
+# Category-specific specification builders
+SPEC_BUILDERS = {
+    'Laptops': build_laptop_specs,
+    'Monitors': build_monitor_specs,
+}
+
+# Specification keys copied onto purchases, per category
+BASE_PURCHASE_SPEC_KEYS = ("color", "dimensions")
+PURCHASE_SPEC_KEYS = {
+    'Laptops': BASE_PURCHASE_SPEC_KEYS + ("screen_size", "processor"),
+    'Monitors': BASE_PURCHASE_SPEC_KEYS + ("resolution", "refresh_rate"),
+}
+
+# INSERT statements used by the seed, one shared string per table
+_INSERT_PRODUCTS = """
+INSERT INTO products (
+    sku, name, category, brand, base_price, current_price, stock_quantity,
+    status, specifications, description, release_date, last_updated
+)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_INSERT_BASKETS = """
+INSERT INTO baskets (
+    basket_id, status, creation_date,
+    client_first_name, client_last_name, client_country
+)
+VALUES (?, ?, ?, ?, ?, ?)
+"""
+_INSERT_PURCHASES = """
+INSERT INTO purchases (
+    purchase_id, product_sku, purchase_date,
+    quantity, unit_price, total_amount,
+    basket_id,
+    product_name, product_category, product_brand, product_specs
+)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
 def generate_product_name(category, brand):
     """Generate a realistic product name"""
     adjectives = ['Pro', 'Elite', 'Premium', 'Ultra', 'Smart', 'Advanced', 'Essential']
@@ -17,35 +114,97 @@ def generate_product_name(category, brand):
     
     return f"{brand} {random.choice(adjectives)} {category} {random.choice(specs)}"
 
-def init_database():
-    """Initialize the database if it doesn't exist, otherwise just connect to it"""
-    
-    db_exists = os.path.exists(DB_FILE)
-    
-    # Connect to the database (creates it if it doesn't exist)
+def generate_skus(count):
+    """Generate `count` unique random SKUs"""
+    # One batched draw of 4 random bytes per SKU, hex-encoded to 8 characters
+    raw = _RNG.bytes(4 * count)
+    tokens = dict.fromkeys(raw[i:i + 4].hex().upper() for i in range(0, len(raw), 4))
+    # Top up in the (rare) case of collisions
+    while len(tokens) < count:
+        tokens[_RNG.bytes(4).hex().upper()] = None
+    return [f"SKU-{token}" for token in tokens]
+
+def _connect():
+    """Open the database (creating the file if needed)"""
     conn = sqlite3.connect(DB_FILE)
     conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    return conn, conn.cursor()
+
+def _seed_database(cursor):
+    """Drop any existing tables and rebuild them with freshly generated sample data"""
+    seed_generators()
+    
+    # Manage the seed's transaction explicitly (autocommit mode) for the duration of the load
+    conn = cursor.connection
+    conn.isolation_level = None
+    
+    # Relax durability for the one-shot bulk load
+    cursor.execute("PRAGMA synchronous=OFF")
+    cursor.execute("PRAGMA journal_mode=MEMORY")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-65536")  # 64 MB page cache
     
-    # Only create tables and populate with data if the database doesn't exist
-    if not db_exists:
-        print(f"Creating new database: {DB_FILE}")
+    # Create and populate everything in a single transaction
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        # Drop tables left by an older schema (referencing tables first)
+        for table in ("purchases", "baskets", "products"):
+            cursor.execute(f"DROP TABLE IF EXISTS {table}")
         
         # Create tables
         create_tables(cursor)
         
         # Populate with sample data
-        populate_products(cursor, 1000)
-        populate_purchases(cursor, 1000)
+        products = populate_products(cursor, 1000)
+        populate_purchases(cursor, 1000, products)
+        
+        # Index once the data is in; building indexes up front would slow every insert
+        create_indexes(cursor)
+        
+        # Gather statistics so the query planner uses the indexes
+        cursor.execute("ANALYZE")
+        
+        # Mark the schema as current so later starts skip the seed
+        cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
         
         # Commit changes
-        conn.commit()
-        print("Database initialized with sample data.")
+        cursor.execute("COMMIT")
+    except Exception:
+        cursor.execute("ROLLBACK")
+        raise
+    
+    # Restore durable settings for normal use
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    # journal_mode returns a row; fetch it so the statement finishes and releases its lock
+    cursor.execute("PRAGMA journal_mode=WAL").fetchall()
+    
+    # Hand the connection back in the default mode, so other statements only persist on an explicit commit
+    conn.isolation_level = ""
+    
+    # Regenerate the LLM prompt data so it describes the freshly built schema
+    save_llm_prompt_data()
+    print("Database initialized with sample data.")
+
+def init_database():
+    """Connect to the database, building it only if its schema version is not current"""
+    conn, cursor = _connect()
+    
+    schema_version = cursor.execute("PRAGMA user_version").fetchone()[0]
+    if schema_version != SCHEMA_VERSION:
+        print(f"Creating database: {DB_FILE} (schema version {schema_version} -> {SCHEMA_VERSION})")
+        _seed_database(cursor)
     else:
         print(f"Using existing database: {DB_FILE}")
     
     return conn, cursor
 
+def reseed_database():
+    """Regenerate the sample data even if the schema is current"""
+    conn, cursor = _connect()
+    print(f"Reseeding database: {DB_FILE}")
+    _seed_database(cursor)
+    return conn, cursor
+
 def create_tables(cursor):
     """Create the database tables"""
     
@@ -62,206 +221,223 @@ def create_tables(cursor):
         status TEXT,
         specifications JSON NOT NULL,
         description TEXT,
-        release_day INTEGER,
-        release_month INTEGER,
-        release_year INTEGER,
+        release_date TEXT,
         last_updated TIMESTAMP
     )
     ''')
     
+    # Create baskets table (one row per basket, shared by its purchases)
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS baskets (
+        basket_id TEXT PRIMARY KEY,
+        status TEXT,
+        creation_date TEXT,
+        client_first_name TEXT NOT NULL,
+        client_last_name TEXT NOT NULL,
+        client_country TEXT NOT NULL
+    )
+    ''')
+    
     # Create purchases table
     cursor.execute('''
     CREATE TABLE IF NOT EXISTS purchases (
         purchase_id TEXT PRIMARY KEY,
         product_sku TEXT NOT NULL,
-        purchase_day INTEGER,
-        purchase_month INTEGER,
-        purchase_year INTEGER,
+        purchase_date TEXT NOT NULL,
         quantity INTEGER NOT NULL,
         unit_price DECIMAL(10,2) NOT NULL,
         total_amount DECIMAL(10,2) NOT NULL,
         basket_id TEXT NOT NULL,
-        basket_status TEXT,
-        basket_creation_day INTEGER,
-        basket_creation_month INTEGER,
-        basket_creation_year INTEGER,
-        client_first_name TEXT NOT NULL,
-        client_last_name TEXT NOT NULL,
-        client_country TEXT NOT NULL,
         product_name TEXT NOT NULL,
         product_category TEXT NOT NULL,
         product_brand TEXT NOT NULL,
-        product_specs JSON NOT NULL
+        product_specs JSON NOT NULL,
+        FOREIGN KEY (product_sku) REFERENCES products(sku),
+        FOREIGN KEY (basket_id) REFERENCES baskets(basket_id)
     )
     ''')
 
-def populate_products(cursor, num_products):
-    fake = Faker()
-    products_data = []
-    for _ in range(num_products):
-        category = random.choice(['Laptops', 'Desktop PCs', 'Monitors', 'Keyboards', 'Mice',
-                                 'Headphones', 'Speakers', 'Webcams', 'Printers', 'Storage'])
-        brand = random.choice(['Dell', 'HP', 'Lenovo', 'Apple', 'ASUS', 'Acer', 'LG', 'Samsung', 'BenQ', 'Logitech',
-                               'Razer', 'Corsair', 'HyperX', 'SteelSeries', 'Sony', 'Bose', 'Sennheiser', 'JBL', 'Sonos',
-                               'Harman Kardon'])
-        base_price = round(random.uniform(50, 5000), 2)
+def create_indexes(cursor):
+    """Create indexes for the common analytical lookups (run after the bulk load)"""
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_purchases_sku_date ON purchases(product_sku, purchase_date)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_purchases_date ON purchases(purchase_date)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_purchases_basket ON purchases(basket_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_products_cat_brand ON products(category, brand)")
+
+def _gen_products(num_products, catalog):
+    """Yield product rows one at a time for executemany, recording each product in `catalog`"""
+    fake = _FAKER
+    rng = _RNG
+    
+    # Draw the per-row random columns in bulk; tolist() gives native types for sqlite3
+    categories = rng.choice(CATEGORIES, size=num_products).tolist()
+    brands = rng.choice(BRANDS, size=num_products).tolist()
+    base_prices = np.round(rng.uniform(50, 5000, num_products), 2)
+    current_prices = np.round(base_prices * rng.uniform(0.8, 1.2, num_products), 2).tolist()  # Current price varies ±20%
+    base_prices = base_prices.tolist()
+    stocks = rng.integers(0, 1001, num_products).tolist()
+    statuses = rng.choice(PRODUCT_STATUSES, size=num_products).tolist()
+    skus = generate_skus(num_products)
+    
+    # Numeric spec fields and release dates (up to two years back) drawn the same way
+    weights = rng.integers(1, 11, num_products).tolist()
+    dimensions = rng.integers([10, 10, 2], [51, 51, 11], size=(num_products, 3)).tolist()
+    release_offsets = rng.integers(0, 2 * 365 + 1, num_products).tolist()
+    now = datetime.now()
+    today = now.date()
+    
+    # Sample colors and descriptions from pre-generated pools instead of calling Faker per row
+    colors = rng.choice([fake.color_name() for _ in range(COLOR_POOL_SIZE)], size=num_products).tolist()
+    descriptions = rng.choice([fake.text(max_nb_chars=200) for _ in range(DESCRIPTION_POOL_SIZE)], size=num_products).tolist()
+    
+    for i, sku in enumerate(skus):
+        category = categories[i]
+        brand = brands[i]
+        width, height, depth = dimensions[i]
         
-        # Generate realistic specifications based on category
-        specs = {
-            "color": fake.color_name(),
-            "weight": f"{random.randint(1, 10)} kg",
-            "dimensions": f"{random.randint(10, 50)}x{random.randint(10, 50)}x{random.randint(2, 10)} cm"
-        }
+        # Generate realistic specifications, adding category-specific ones
+        specs = SPEC_BUILDERS.get(category, build_default_specs)({
+            "color": colors[i],
+            "weight": f"{weights[i]} kg",
+            "dimensions": f"{width}x{height}x{depth} cm"
+        })
+
+        # Get release date
+        release_date = today - timedelta(days=release_offsets[i])
+        
+        name = generate_product_name(category, brand)
         
-        # Add category-specific specifications
-        if category == 'Laptops':
-            specs.update({
-                "screen_size": f"{random.choice([13, 14, 15, 16, 17])} inch",
-                "processor": f"Intel Core i{random.randint(3, 9)} Gen {random.randint(10, 13)}",
-                "ram": f"{random.choice([8, 16, 32, 64])}GB",
-                "storage": f"{random.choice([256, 512, 1024, 2048])}GB SSD"
-            })
-        elif category == 'Monitors':
-            specs.update({
-                "resolution": random.choice(['1920x1080', '2560x1440', '3840x2160']),
-                "refresh_rate": f"{random.choice([60, 75, 144, 165, 240])}Hz",
-                "panel_type": random.choice(['IPS', 'VA', 'TN', 'OLED'])
-            })
-
-        # Get release date components
-        release_date = fake.date_between(start_date='-2y', end_date='today')
+        # Keep the specs as a dict for the purchase generator; JSON is only produced for the insert
+        catalog.append({
+            'sku': sku,
+            'name': name,
+            'category': category,
+            'brand': brand,
+            'current_price': current_prices[i],
+            'specifications': specs
+        })
         
-        products_data.append((
-            f"SKU-{uuid.uuid4().hex[:8].upper()}",
-            generate_product_name(category, brand),
+        yield (
+            sku,
+            name,
             category,
             brand,
-            base_price,
-            round(base_price * random.uniform(0.8, 1.2), 2),  # Current price varies ±20%
-            random.randint(0, 1000),
-            random.choice(['in_stock', 'low_stock', 'out_of_stock', 'discontinued']),
-            json.dumps(specs),
-            fake.text(max_nb_chars=200),
-            release_date.day,      # Day component
-            release_date.month,    # Month component
-            release_date.year,     # Year component
-            datetime.now()
-        ))
-
-    # Insert the products
-    cursor.executemany("""
-    INSERT INTO products (
-        sku, name, category, brand, base_price, current_price, stock_quantity,
-        status, specifications, description, release_day, release_month, release_year, last_updated
-    )
-    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, products_data)
-
-def populate_purchases(cursor, num_purchases):
-    fake = Faker()
-    products_data = cursor.execute("SELECT sku, current_price FROM products").fetchall()
-    purchases_data = []
-    used_purchase_ids = set()
-    basket_info = {}  # Store basket information for reuse
-
-    for _ in range(num_purchases):
-        product = random.choice(products_data)
-        purchase_date = fake.date_time_between(start_date='-5y')
-        
-        # Generate unique purchase ID
-        while True:
-            purchase_id = f"PUR-{purchase_date.strftime('%Y%m')}-{random.randint(10000, 99999)}"
-            if purchase_id not in used_purchase_ids:
-                used_purchase_ids.add(purchase_id)
-                break
-
-        # Generate or reuse basket information (30% chance to reuse existing basket)
-        if basket_info and random.random() < 0.3:
-            basket_id = random.choice(list(basket_info.keys()))
-            basket_data = basket_info[basket_id]
+            base_prices[i],
+            current_prices[i],
+            stocks[i],
+            statuses[i],
+            orjson.dumps(specs).decode(),
+            descriptions[i],
+            release_date.isoformat(),
+            now
+        )
+
+def populate_products(cursor, num_products):
+    """Insert generated products and return them as dicts with parsed specifications"""
+    catalog = []
+    # Insert the products, streaming rows from the generator
+    cursor.executemany(_INSERT_PRODUCTS, _gen_products(num_products, catalog))
+    return catalog
+
+def _gen_purchases(products_data, num_purchases, basket_info):
+    """Yield purchase rows one at a time for executemany, recording each new basket row in `basket_info`"""
+    fake = _FAKER
+    rng = _RNG
+    
+    # Draw product picks, quantities and dates for every purchase up front
+    product_indices = rng.integers(0, len(products_data), num_purchases).tolist()
+    quantities = rng.integers(1, 6, num_purchases).tolist()
+    purchase_dates = [fake.date_time_between(start_date='-5y') for _ in range(num_purchases)]
+    
+    # Basket-level draws, one per purchase (only used when the purchase opens a new basket)
+    reuse_basket = (rng.random(num_purchases) < 0.3).tolist()  # 30% chance to reuse an existing basket
+    basket_suffixes = rng.integers(1000, 10000, num_purchases).tolist()
+    basket_statuses = rng.choice(BASKET_STATUSES, size=num_purchases).tolist()
+    basket_age_seconds = rng.integers(0, 7 * 24 * 3600 + 1, num_purchases).tolist()  # Created up to 7 days earlier
+    
+    # Sample clients (first name, last name, country) from a pre-generated pool instead of calling Faker per basket
+    clients = [(fake.first_name(), fake.last_name(), fake.country()) for _ in range(CLIENT_POOL_SIZE)]
+    client_indices = rng.integers(0, CLIENT_POOL_SIZE, num_purchases).tolist()
+    
+    # Basket IDs in creation order, so reuse can pick one without copying basket_info's keys
+    basket_ids = []
+    
+    # Format each purchase's YYYYMM prefix once and draw only as many distinct ID suffixes (10000-99999) as each month needs
+    purchase_months = [d.strftime('%Y%m') for d in purchase_dates]
+    month_counts = Counter(purchase_months)
+    id_suffixes = {
+        month: iter((rng.choice(90000, size=count, replace=False) + 10000).tolist())
+        for month, count in month_counts.items()
+    }
+
+    for i, purchase_date in enumerate(purchase_dates):
+        product = products_data[product_indices[i]]
+        quantity = quantities[i]
+        month = purchase_months[i]
+        purchase_id = f"PUR-{month}-{next(id_suffixes[month])}"
+
+        # Generate or reuse basket information
+        if basket_info and reuse_basket[i]:
+            basket_id = random.choice(basket_ids)
         else:
-            basket_id = f"BSKT-{purchase_date.strftime('%Y%m')}-{random.randint(1000, 9999)}"
-            basket_creation_date = fake.date_time_between(
-                start_date=purchase_date - timedelta(days=7),
-                end_date=purchase_date
+            basket_id = f"BSKT-{month}-{basket_suffixes[i]}"
+            # Redraw the suffix on a collision so an existing basket's details are never overwritten
+            while basket_id in basket_info:
+                basket_id = f"BSKT-{month}-{rng.integers(1000, 10000)}"
+            basket_creation_date = purchase_date - timedelta(seconds=basket_age_seconds[i])
+            basket_ids.append(basket_id)
+            basket_info[basket_id] = (
+                basket_id,
+                basket_statuses[i],
+                basket_creation_date.strftime('%Y-%m-%d'),
+                *clients[client_indices[i]]
             )
-            basket_data = {
-                'status': random.choice(['completed', 'pending', 'cancelled', 'refunded']),
-                'creation_day': basket_creation_date.day,
-                'creation_month': basket_creation_date.month,
-                'creation_year': basket_creation_date.year,
-                'client_first_name': fake.first_name(),
-                'client_last_name': fake.last_name(),
-                'client_country': fake.country()
-            }
-            basket_info[basket_id] = basket_data
 
         # Calculate purchase details
-        quantity = random.randint(1, 5)
         unit_price = float(product['current_price'])
         total_amount = quantity * unit_price
 
         # Extract relevant product specifications
-        full_specs = json.loads(product['specifications'])
+        full_specs = product['specifications']
         relevant_specs = {
-            "color": full_specs.get("color"),
-            "dimensions": full_specs.get("dimensions")
+            key: full_specs.get(key)
+            for key in PURCHASE_SPEC_KEYS.get(product['category'], BASE_PURCHASE_SPEC_KEYS)
         }
-        
-        if product['category'] == 'Laptops':
-            relevant_specs.update({
-                "screen_size": full_specs.get("screen_size"),
-                "processor": full_specs.get("processor")
-            })
-        elif product['category'] == 'Monitors':
-            relevant_specs.update({
-                "resolution": full_specs.get("resolution"),
-                "refresh_rate": full_specs.get("refresh_rate")
-            })
-
-        purchases_data.append((
+
+        yield (
             purchase_id,
             product['sku'],                    # product_sku
-            purchase_date.day,
-            purchase_date.month,
-            purchase_date.year,
+            purchase_date.strftime('%Y-%m-%d'),
             quantity,
             unit_price,
             total_amount,
             basket_id,
-            basket_data['status'],
-            basket_data['creation_day'],
-            basket_data['creation_month'],
-            basket_data['creation_year'],
-            basket_data['client_first_name'],
-            basket_data['client_last_name'],
-            basket_data['client_country'],
             product['name'],                    # product_name
             product['category'],                    # product_category
             product['brand'],                    # product_brand
-            json.dumps(relevant_specs)
-        ))
-
-    # Insert the enhanced purchases data
-    cursor.executemany("""
-    INSERT INTO purchases (
-        purchase_id, product_sku, 
-        purchase_day, purchase_month, purchase_year,
-        quantity, unit_price, total_amount,
-        basket_id, basket_status, 
-        basket_creation_day, basket_creation_month, basket_creation_year,
-        client_first_name, client_last_name, client_country,
-        product_name, product_category, product_brand, product_specs
-    )
-    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, purchases_data)
+            orjson.dumps(relevant_specs).decode()
+        )
 
-if __name__ == "__main__":
-    # If run directly, force recreate the database
-    if os.path.exists(DB_FILE):
-        os.remove(DB_FILE)
-        print(f"Deleted existing database: {DB_FILE}")
+def populate_purchases(cursor, num_purchases, products_data=None):
+    """Insert generated purchases of `products_data` (as returned by populate_products), loading them if not given"""
+    if products_data is None:
+        rows = cursor.execute(
+            "SELECT sku, name, category, brand, current_price, specifications FROM products"
+        ).fetchall()
+        products_data = [
+            {**dict(row), 'specifications': orjson.loads(row['specifications'])}
+            for row in rows
+        ]
+    
+    # Insert the purchases, streaming rows from the generator; it collects the baskets as it goes
+    basket_info = {}
+    cursor.executemany(_INSERT_PURCHASES, _gen_purchases(products_data, num_purchases, basket_info))
     
-    conn, cursor = init_database()
+    # Insert one row per basket
+    cursor.executemany(_INSERT_BASKETS, basket_info.values())
+
+if __name__ == "__main__":
+    # If run directly, force regenerate the sample data
+    conn, cursor = reseed_database()
     conn.close()
-    print("Database initialization complete.") 
\ No newline at end of file
+    print("Database initialization complete.")
\ No newline at end of file
@@ -7,7 +7,7 @@ import json
 
 # Import handlers
 from sql_handler import handle_sql_query, load_llm_prompt_data
-from api_handler import handle_api_query, load_api_metadata
+from api_handler import handle_api_query, load_api_metadata, close_session
 
 # Load environment variables from .env
 load_dotenv()
@@ -28,15 +28,10 @@ class QueryType(str, Enum):
     API = "API"
     LLM = "GENERAL"
 
-def route_query(user_query: str) -> QueryType:
-    """Route the query to the appropriate system using both SQL and API metadata"""
-    # Load both SQL and API metadata
-    sql_metadata = load_llm_prompt_data()
-    api_metadata = load_api_metadata()
-    
-    classification_prompt = PromptTemplate(
-        input_variables=["query", "sql_metadata", "api_metadata"],
-        template="""Given the following information about our SQL database and API capabilities, 
+# Routing prompt and chain, built once since both are fixed for the session
+_CLASSIFICATION_PROMPT = PromptTemplate(
+    input_variables=["query", "sql_metadata", "api_metadata"],
+    template="""Given the following information about our SQL database and API capabilities, 
 determine which system should handle this user query:
 
 === SQL DATABASE CAPABILITIES ===
@@ -53,10 +48,16 @@ Based on the query and available systems, classify this query into exactly one o
 - GENERAL: If the query doesn't clearly match either system or requires general knowledge
 
 Respond with exactly one word: SQL, API, or GENERAL"""
-    )
+)
+_ROUTER_CHAIN = _CLASSIFICATION_PROMPT | llm
+
+def route_query(user_query: str) -> QueryType:
+    """Route the query to the appropriate system using both SQL and API metadata"""
+    # Load both SQL and API metadata (both are cached in memory after the first turn)
+    sql_metadata = load_llm_prompt_data()
+    api_metadata = load_api_metadata()
     
-    chain = classification_prompt | llm
-    result = chain.invoke({
+    result = _ROUTER_CHAIN.invoke({
         "query": user_query,
         "sql_metadata": sql_metadata,
         "api_metadata": api_metadata
@@ -96,6 +97,7 @@ def chat():
             
             # Check for exit command
             if user_query.lower() == 'exit':
+                close_session()
                 print("\nGoodbye! 👋")
                 break
                 
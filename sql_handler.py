@@ -1,18 +1,30 @@
 import sqlite3
 import json
-import pandas as pd
+import orjson
+from functools import lru_cache
+import numpy as np
 from scipy import stats
 from langchain.prompts import PromptTemplate
 from db_analyzer import get_db_metadata, save_llm_prompt_data
 
-# Initialize database connection
+# Database connection, opened on first use and shared for the rest of the process
+_conn = None
+
 def get_db_connection():
     """Get a connection to the SQLite database"""
-    from init_database import init_database
-    return init_database()
-
+    global _conn
+    if _conn is None:
+        from init_database import init_database
+        _conn, _ = init_database()
+        # A (re)seed rewrites the prompt data file, so drop any copy read before it
+        load_llm_prompt_data.cache_clear()
+    return _conn, _conn.cursor()
+
+@lru_cache(maxsize=1)
 def load_llm_prompt_data(filename: str = "llm_prompt_data.txt") -> str:
-    """Load the LLM prompt data from file"""
+    """Load the LLM prompt data from file (cached per filename)"""
+    # Open the database first so a pending seed or schema upgrade refreshes the file before it is read
+    get_db_connection()
     try:
         with open(filename, 'r') as f:
             return f.read()
@@ -22,18 +34,12 @@ def load_llm_prompt_data(filename: str = "llm_prompt_data.txt") -> str:
 
 def get_schema_info():
     """Get the database schema information"""
-    # Load LLM prompt data
-    llm_data = load_llm_prompt_data()
-
-    return f"{llm_data}"
+    return load_llm_prompt_data()
 
-def generate_sql_query(llm, user_query):
-    """Generate SQL query from natural language"""
-    schema_info = get_schema_info()
-    
-    sql_prompt = PromptTemplate(
-        input_variables=["schema", "query"],
-        template="""Given the following SQL table schema:
+# Prompt templates are fixed, so parse them once at import
+_SQL_PROMPT = PromptTemplate(
+    input_variables=["schema", "query"],
+    template="""Given the following SQL table schema:
 {schema}
 
 Convert this natural language query into SQL: {query}
@@ -43,9 +49,109 @@ Example format:
 SELECT * FROM table WHERE condition;
 
 Your SQL query:"""
-    )
+)
+
+_STATS_PROMPT = PromptTemplate(
+    input_variables=["schema", "query"],
+    template="""Given the following SQL table schema:
+{schema}
+
+Generate a SQL query to get data for statistical analysis for this request: {query}
+
+Important: Return ONLY the raw SQL query without any markdown formatting, quotes, or explanations.
+Example format:
+SELECT column FROM table WHERE condition;
+
+Your SQL query:"""
+)
+
+_ANALYSIS_PROMPT = PromptTemplate(
+    input_variables=["schema", "query"],
+    template="""Given this database schema and user request, analyze the query needs:
+
+{schema}
+
+User Request: {query}
+
+Provide a JSON response with:
+1. Clarifying questions to improve the query
+2. Potential variations of the query
+3. Important considerations
+4. Suggested filters or conditions
+
+Format your response as a JSON object with these exact keys:
+{{
+    "clarifying_questions": [],
+    "query_variations": [],
+    "considerations": [],
+    "suggested_filters": []
+}}"""
+)
+
+_IMPROVEMENT_PROMPT = PromptTemplate(
+    input_variables=["schema", "query", "analysis", "preferences", "llm_data", "sql_query"],
+    template="""Given this database schema, LLM prompt data, and analysis:
+
+Database Schema:
+{schema}
+
+LLM Prompt Data:
+{llm_data}
+
+Original Request: {query}
+Generated SQL: {sql_query}
+Analysis: {analysis}
+User Preferences: {preferences}
+
+Generate an optimized SQL query that:
+1. Incorporates user preferences
+2. Includes selected filters
+3. Uses appropriate indexing
+4. Follows best practices
+5. Leverages the database structure described in the LLM prompt data
+6. Improves upon the original SQL query where possible
+
+Specifically analyze if the original request could be better answered using information available in the LLM prompt data.
+
+Return ONLY the SQL query without any explanation or markdown."""
+)
+
+# Kept simple so it is more likely to get a valid JSON response
+_VALIDATION_PROMPT = PromptTemplate(
+    input_variables=["sql", "llm_data"],
+    template='''Analyze this SQL query:
+
+{sql}
+
+Database Schema:
+{llm_data}
+
+Respond with a JSON object containing these suggestions:
+{{
+    "strengths": ["strength1", "strength2"],
+    "potential_enhancements": ["enhancement1", "enhancement2"],
+    "business_considerations": ["consideration1", "consideration2"],
+    "suggested_variations": ["variation1", "variation2"]
+}}
+
+Your response must be valid JSON.'''
+)
+
+# prompt | llm chains keyed by (prompt, llm); the llm is kept in the value so its id stays valid
+_CHAINS = {}
+
+def _get_chain(prompt, llm):
+    """Return the prompt | llm chain, building it on first use"""
+    key = (id(prompt), id(llm))
+    if key not in _CHAINS:
+        _CHAINS[key] = (llm, prompt | llm)
+    return _CHAINS[key][1]
+
+def generate_sql_query(llm, user_query):
+    """Generate SQL query from natural language"""
+    schema_info = get_schema_info()
     
-    chain = sql_prompt | llm
+    chain = _get_chain(_SQL_PROMPT, llm)
     return chain.invoke({
         "schema": schema_info,
         "query": user_query
@@ -64,44 +170,47 @@ def execute_sql_query(sql_query):
             return "No results found."
             
         # Format results as a table
-        output = "\nResults:\n" + " | ".join(columns) + "\n" + "-" * (len(" | ".join(columns))) + "\n"
-        for row in results:
-            output += " | ".join(str(item) for item in row) + "\n"
-        return output
+        header = " | ".join(columns)
+        body = "\n".join(" | ".join(map(str, row)) for row in results)
+        return f"\nResults:\n{header}\n{'-' * len(header)}\n{body}\n"
     except sqlite3.Error as e:
         return f"Error executing SQL query: {str(e)}"
+    finally:
+        # The connection is shared, so never leave a generated statement's changes pending
+        conn.rollback()
+
+def _is_numeric_column(values):
+    """Whether a result column holds numbers (ignoring NULLs)"""
+    return (any(value is not None for value in values)
+            and all(value is None or isinstance(value, (int, float)) for value in values))
 
 def perform_statistical_analysis(llm, user_query):
     """Perform statistical analysis on query results"""
     schema_info = get_schema_info()
     conn, cursor = get_db_connection()
     
-    stats_prompt = PromptTemplate(
-        input_variables=["schema", "query"],
-        template="""Given the following SQL table schema:
-{schema}
-
-Generate a SQL query to get data for statistical analysis for this request: {query}
-
-Important: Return ONLY the raw SQL query without any markdown formatting, quotes, or explanations.
-Example format:
-SELECT column FROM table WHERE condition;
-
-Your SQL query:"""
-    )
-    
     # Get data using SQL
-    chain = stats_prompt | llm
+    chain = _get_chain(_STATS_PROMPT, llm)
     sql_query = chain.invoke({
         "schema": schema_info,
         "query": user_query
     }).content.strip()
     
-    # Execute SQL and convert to pandas DataFrame
-    cursor.execute(sql_query)
-    columns = [description[0] for description in cursor.description]
-    results = cursor.fetchall()
-    df = pd.DataFrame(results, columns=columns)
+    # Execute SQL and split the rows into per-column arrays
+    try:
+        cursor.execute(sql_query)
+        columns = [description[0] for description in cursor.description]
+        results = cursor.fetchall()
+    finally:
+        conn.rollback()
+    column_values = list(zip(*results)) if results else [() for _ in columns]
+    
+    # Numerical columns as float arrays (NULL becomes NaN)
+    numeric_data = {
+        col: np.array(values, dtype=np.float64)
+        for col, values in zip(columns, column_values)
+        if _is_numeric_column(values)
+    }
     
     # Perform statistical analysis
     analysis_results = []
@@ -110,19 +219,19 @@ Your SQL query:"""
     analysis_results.append("Statistical Analysis:")
     
     # Calculate basic metrics for numerical columns
-    numeric_columns = df.select_dtypes(include=['int64', 'float64']).columns
-    for col in numeric_columns:
+    for col, values in numeric_data.items():
         analysis_results.append(f"\n{col} Statistics:")
-        analysis_results.append(f"Mean: {df[col].mean():.2f}")
-        analysis_results.append(f"Median: {df[col].median():.2f}")
-        analysis_results.append(f"Std Dev: {df[col].std():.2f}")
-    
-    # If comparing two groups, perform t-test
-    if len(df.groupby(df.columns[0])) == 2:
-        groups = df.groupby(df.columns[0])
-        group1, group2 = [group for _, group in groups]
-        for col in numeric_columns:
-            t_stat, p_value = stats.ttest_ind(group1[col], group2[col])
+        analysis_results.append(f"Mean: {np.nanmean(values):.2f}")
+        analysis_results.append(f"Median: {np.nanmedian(values):.2f}")
+        analysis_results.append(f"Std Dev: {np.nanstd(values, ddof=1):.2f}")
+    
+    # If comparing two groups (distinct values of the first column), perform t-test
+    group_keys = sorted({key for key in column_values[0] if key is not None})
+    if len(group_keys) == 2:
+        keys = np.array(column_values[0], dtype=object)
+        in_group1, in_group2 = keys == group_keys[0], keys == group_keys[1]
+        for col, values in numeric_data.items():
+            t_stat, p_value = stats.ttest_ind(values[in_group1], values[in_group2])
             analysis_results.append(f"\nT-test for {col}:")
             analysis_results.append(f"t-statistic: {t_stat:.2f}")
             analysis_results.append(f"p-value: {p_value:.4f}")
@@ -133,30 +242,7 @@ def analyze_sql_request(llm, user_query):
     """Analyze the SQL request and suggest improvements"""
     schema_info = get_schema_info()
     
-    analysis_prompt = PromptTemplate(
-        input_variables=["schema", "query"],
-        template="""Given this database schema and user request, analyze the query needs:
-
-{schema}
-
-User Request: {query}
-
-Provide a JSON response with:
-1. Clarifying questions to improve the query
-2. Potential variations of the query
-3. Important considerations
-4. Suggested filters or conditions
-
-Format your response as a JSON object with these exact keys:
-{
-    "clarifying_questions": [],
-    "query_variations": [],
-    "considerations": [],
-    "suggested_filters": []
-}"""
-    )
-    
-    chain = analysis_prompt | llm
+    chain = _get_chain(_ANALYSIS_PROMPT, llm)
     analysis = json.loads(chain.invoke({
         "schema": schema_info,
         "query": user_query
@@ -213,35 +299,7 @@ def generate_improved_sql(llm, user_query, analysis, preferences):
     # First generate a basic SQL query to improve upon
     basic_sql = generate_sql_query(llm, user_query)
     
-    improvement_prompt = PromptTemplate(
-        input_variables=["schema", "query", "analysis", "preferences", "llm_data", "sql_query"],
-        template="""Given this database schema, LLM prompt data, and analysis:
-
-Database Schema:
-{schema}
-
-LLM Prompt Data:
-{llm_data}
-
-Original Request: {query}
-Generated SQL: {sql_query}
-Analysis: {analysis}
-User Preferences: {preferences}
-
-Generate an optimized SQL query that:
-1. Incorporates user preferences
-2. Includes selected filters
-3. Uses appropriate indexing
-4. Follows best practices
-5. Leverages the database structure described in the LLM prompt data
-6. Improves upon the original SQL query where possible
-
-Specifically analyze if the original request could be better answered using information available in the LLM prompt data.
-
-Return ONLY the SQL query without any explanation or markdown."""
-    )
-    
-    chain = improvement_prompt | llm
+    chain = _get_chain(_IMPROVEMENT_PROMPT, llm)
     return chain.invoke({
         "schema": schema_info,
         "query": user_query,
@@ -251,58 +309,42 @@ Return ONLY the SQL query without any explanation or markdown."""
         "sql_query": basic_sql
     }).content.strip()
 
+_JSON_DECODER = json.JSONDecoder()
+
+def _parse_json_object(text):
+    """Parse an LLM response as JSON, or the first JSON object embedded in it; None if there is none"""
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        pass
+    
+    # Look for a JSON object amid text before or after it
+    start = text.find('{')
+    while start >= 0:
+        try:
+            return _JSON_DECODER.raw_decode(text, start)[0]
+        except json.JSONDecodeError:
+            start = text.find('{', start + 1)
+    return None
+
 def validate_sql_query(llm, sql_query):
     """Validate and analyze the generated SQL query"""
     # Load LLM prompt data
     llm_data = load_llm_prompt_data()
     
-    # Create a simpler prompt that's more likely to get a valid JSON response
-    validation_prompt = PromptTemplate(
-        input_variables=["sql", "llm_data"],
-        template='''Analyze this SQL query:
-
-{sql}
-
-Database Schema:
-{llm_data}
-
-Respond with a JSON object containing these suggestions:
-{{
-    "strengths": ["strength1", "strength2"],
-    "potential_enhancements": ["enhancement1", "enhancement2"],
-    "business_considerations": ["consideration1", "consideration2"],
-    "suggested_variations": ["variation1", "variation2"]
-}}
-
-Your response must be valid JSON.'''
-    )
-    
     try:
         # Use a simpler approach with fewer variables
-        chain = validation_prompt | llm
+        chain = _get_chain(_VALIDATION_PROMPT, llm)
         response = chain.invoke({
             "sql": sql_query,
             "llm_data": llm_data
         }).content.strip()
         
-        # Try to parse the JSON, with multiple fallback approaches
-        try:
-            # First try direct parsing
-            return json.loads(response)
-        except json.JSONDecodeError:
-            # Try to extract JSON if there's text before or after
-            try:
-                # Look for JSON between curly braces
-                json_start = response.find('{')
-                json_end = response.rfind('}') + 1
-                if json_start >= 0 and json_end > json_start:
-                    json_str = response[json_start:json_end]
-                    return json.loads(json_str)
-            except:
-                # If all parsing fails, create a basic response
-                print("\n⚠️ Could not parse LLM response as JSON")
-                print("Continuing without validation suggestions.")
-                return None
+        validation = _parse_json_object(response)
+        if validation is None:
+            print("\n⚠️ Could not parse LLM response as JSON")
+            print("Continuing without validation suggestions.")
+        return validation
             
     except Exception as e:
         print(f"\n⚠️ Error during query validation: {str(e)}")